@@ -1,63 +1,166 @@
 # app.py
 import streamlit as st
-import networkx as nx
+import streamlit.components.v1 as components
 import folium
-from streamlit_folium import st_folium
 from folium.plugins import AntPath
 import pandas as pd
-from math import radians, sin, cos, sqrt, atan2
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
 from datetime import datetime
+from collections import namedtuple
 
 st.set_page_config(page_title="Smart Delivery Route Planner 🚚", layout="wide")
 st.title("🚚 Smart Delivery Route Planner")
-st.markdown("Interactive shortest-route planner — stable UI + animated route. (Dijkstra under the hood)")
+st.markdown("Interactive shortest-route planner — stable UI + optional animated route. (Dijkstra under the hood)")
+
+# A saved location record (lighter than a dict and hashable)
+Location = namedtuple("Location", "name lat lon")
 
 # ------------------ Helper Functions ------------------
+class NoPathError(Exception):
+    """Raised when no route connects two locations"""
+
 def init_state():
-    if "locations" not in st.session_state:
-        st.session_state.locations = []  # list of dicts: {"name":..., "lat":..., "lon":...}
+    if "locations_df" not in st.session_state:
+        st.session_state.locations_df = pd.DataFrame(columns=["name", "lat", "lon"])  # saved locations, column layout
     if "edges" not in st.session_state:
         st.session_state.edges = []      # list of tuples: (u_name, v_name, weight)
+    if "adj" not in st.session_state:
+        st.session_state.adj = {}        # adjacency dict: {u_name: {v_name: {"weight": w}}}
     if "saved_routes" not in st.session_state:
         st.session_state.saved_routes = []  # list of saved routes
     if "last_route" not in st.session_state:
         st.session_state.last_route = {}  # store last calculated route
 
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """Calculate real distance between two coordinates in km"""
+def haversine_matrix(lats, lons):
+    """Calculate real distances between all pairs of coordinates in km (lats/lons in radians)"""
     R = 6371  # Earth radius in km
     
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
+    dlat = lats[None, :] - lats[:, None]
+    dlon = lons[None, :] - lons[:, None]
     
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
+    a = np.sin(dlat/2)**2 + np.cos(lats)[:, None] * np.cos(lats)[None, :] * np.sin(dlon/2)**2
     
-    return R * c
-
-@st.cache_data
-def build_graph_cached(locations, edges):
-    """Cache the graph building for better performance"""
-    G = nx.Graph()
-    for loc in locations:
-        G.add_node(loc["name"], pos=(loc["lat"], loc["lon"]))
-    for (u, v, w) in edges:
-        G.add_edge(u, v, weight=w)
-    return G
-
-def coords_by_name(name):
-    for loc in st.session_state.locations:
-        if loc["name"] == name:
-            return (loc["lat"], loc["lon"])
-    return None
-
-def export_route_to_csv(path, distance):
+    return 2 * R * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+@st.cache_resource
+def get_haversine_kernel():
+    """Compile the haversine kernel once per process (numba if installed, else plain NumPy)"""
+    try:
+        from numba import njit
+    except ImportError:
+        return haversine_matrix
+    kernel = njit(cache=True, fastmath=True)(haversine_matrix)
+    kernel(np.zeros(1), np.zeros(1))  # warm up so the first form interaction isn't stalled
+    return kernel
+
+def build_adjacency(locations, edges):
+    """Adjacency dict {u: {v: {"weight": w}}} of the saved roads """
+    adj = {loc.name: {} for loc in locations}
+    for u, v, w in edges:
+        adj[u][v] = {"weight": w}
+        adj[v][u] = {"weight": w}
+    return adj
+
+@st.cache_resource(max_entries=32, ttl=3600)
+def build_csgraph_cached(names_key, edge_key, _adj):
+    """Cache a CSR adjacency matrix of the graph for scipy's compiled Dijkstra"""
+    names = list(names_key)
+    name_to_idx = {n: i for i, n in enumerate(names)}
+    row, col, data = [], [], []
+    # Roads are undirected: the adjacency dict already holds both directions
+    for u, nbrs in _adj.items():
+        for v, d in nbrs.items():
+            row.append(name_to_idx[u])
+            col.append(name_to_idx[v])
+            data.append(d["weight"])
+    csr = csr_matrix((data, (row, col)), shape=(len(names), len(names)))
+    return csr, names, name_to_idx
+
+def shortest_segments(route_index, waypoints):
+    """Yield the shortest (distance, path) for each consecutive pair of waypoints"""
+    csr, names, name_to_idx = route_index
+    # One compiled multi-source call covers every segment of the route
+    dist, pred = dijkstra(csr, indices=[name_to_idx[w] for w in waypoints[:-1]],
+                          return_predecessors=True)
+    for row, (source, target) in enumerate(zip(waypoints, waypoints[1:])):
+        src, tgt = name_to_idx[source], name_to_idx[target]
+        if np.isinf(dist[row, tgt]):
+            raise NoPathError(f"No path between {source} and {target}.")
+        
+        # Walk the predecessor array back from the target
+        path = [tgt]
+        while path[-1] != src:
+            path.append(pred[row, path[-1]])
+        yield float(dist[row, tgt]), [names[i] for i in reversed(path)]
+
+def shortest_segment(route_index, source, target):
+    """Shortest (distance, path) between two locations using scipy.sparse.csgraph"""
+    return next(shortest_segments(route_index, [source, target]))
+
+@st.cache_data(max_entries=32, ttl=3600)
+def render_map_html(loc_key, edge_key, path_key, stops_key, center, zoom, tile, show_w, animate):
+    """Build the folium map (with the route, if any) and cache its rendered HTML"""
+    coords = {name: (lat, lon) for name, lat, lon in loc_key}
+    # Canvas renderer: faster paint and pan/zoom than SVG with many markers and lines
+    m = folium.Map(location=list(center), zoom_start=zoom, tiles=tile, prefer_canvas=True)
+
+    # Add all nodes (grouped so the map gets a single layer)
+    nodes_fg = folium.FeatureGroup(name="nodes")
+    for name, lat, lon in loc_key:
+        folium.Marker([lat, lon], popup=name,
+                      icon=folium.Icon(color="blue", icon="info-sign")).add_to(nodes_fg)
+    nodes_fg.add_to(m)
+
+    # Draw all edges (light)
+    edges_fg = folium.FeatureGroup(name="edges")
+    for u, v, w in edge_key:
+        c1 = coords.get(u)
+        c2 = coords.get(v)
+        if c1 and c2:
+            # distance shown as a hover tooltip on the line itself
+            folium.PolyLine(locations=[c1, c2], weight=2, color="#888", opacity=0.6,
+                            tooltip=f"{w:.1f}" if show_w else None).add_to(edges_fg)
+    edges_fg.add_to(m)
+
+    if path_key:
+        # Path coordinates
+        path_coords = [coords[node] for node in path_key if node in coords]
+
+        # Route path: animated (AntPath) or a lightweight static line
+        if animate:
+            AntPath(path_coords, color="#00cc44", weight=6, delay=1000).add_to(m)
+        else:
+            folium.PolyLine(path_coords, color="#00cc44", weight=6).add_to(m)
+
+        # Start & End markers larger
+        folium.Marker(path_coords[0], popup="Start: " + path_key[0],
+                    icon=folium.Icon(color="red", icon="home")).add_to(m)
+        folium.Marker(path_coords[-1], popup="End: " + path_key[-1],
+                    icon=folium.Icon(color="green", icon="flag")).add_to(m)
+
+        # Add markers for intermediate stops if multi-stop
+        for i, stop in enumerate(stops_key):
+            stop_coords = coords.get(stop)
+            if stop_coords:
+                folium.Marker(stop_coords, popup=f"Stop {i+1}: {stop}",
+                            icon=folium.Icon(color="orange", icon="star")).add_to(m)
+
+    return m.get_root().render()
+
+@st.cache_data(max_entries=32)
+def export_route_to_csv(path_t, distance):
     """Export route to CSV format"""
-    csv_data = f"Route,Distance\n{','.join(path)},{distance}"
+    csv_data = f"Route,Distance\n{','.join(path_t)},{distance}"
     return csv_data
 
-def calculate_route(start, end, stops, G):
+@st.cache_data(max_entries=32)
+def route_instructions(path_t):
+    """Step-by-step route instructions as plain text"""
+    return "\n".join(f"{i+1}. Go to {point}" for i, point in enumerate(path_t))
+
+def calculate_route(start, end, stops, route_index):
     """Calculate route and store in session state"""
     try:
         with st.spinner('Finding optimal route...'):
@@ -67,44 +170,61 @@ def calculate_route(start, end, stops, G):
                 total_distance = 0
                 
                 # Find path through all stops in order
+                segments = shortest_segments(route_index, [start] + stops + [end])
                 current_point = start
                 for stop in stops + [end]:
                     try:
-                        segment_path = nx.shortest_path(G, source=current_point, target=stop, weight="weight")
-                        segment_distance = nx.shortest_path_length(G, source=current_point, target=stop, weight="weight")
+                        segment_distance, segment_path = next(segments)
                         
                         # Add segment to full path (avoid duplicating the current point)
                         full_path.extend(segment_path[1:])
                         total_distance += segment_distance
                         current_point = stop
-                    except nx.NetworkXNoPath:
+                    except NoPathError:
                         st.error(f"❌ No path exists between {current_point} and {stop}.")
                         return None, None
                 path = full_path
             else:
                 # Single path from start to end
-                path = nx.shortest_path(G, source=start, target=end, weight="weight")
-                total_distance = nx.shortest_path_length(G, source=start, target=end, weight="weight")
+                total_distance, path = shortest_segment(route_index, start, end)
 
         return path, total_distance
         
-    except nx.NetworkXNoPath:
+    except NoPathError:
         st.error("❌ No path exists between the selected nodes with the given roads.")
         return None, None
     except Exception as ex:
         st.error(f"An unexpected error occurred: {ex}")
         return None, None
 
+@st.fragment
+def saved_routes_panel():
+    """Saved routes list; deleting a route only reruns this fragment"""
+    if st.session_state.saved_routes:
+        st.markdown("---")
+        st.subheader("💾 Saved Routes")
+        for i, route in enumerate(st.session_state.saved_routes):
+            with st.expander(f"Route {i+1}: {route['path'][0]} → {route['path'][-1]} ({route['distance']:.2f} units)"):
+                st.write(f"**Path:** {' → '.join(route['path'])}")
+                st.write(f"**Distance:** {route['distance']:.2f} units")
+                st.write(f"**Saved:** {route['timestamp']}")
+                if st.button(f"Delete Route {i+1}", key=f"delete_{i}"):
+                    st.session_state.saved_routes.pop(i)
+                    st.rerun(scope="fragment")
+
 # initialize session state containers
 init_state()
+haversine = get_haversine_kernel()
 
 # ------------------ SIDEBAR: Configuration Form ------------------
 with st.sidebar:
     st.header("📍 Configure Map")
     
     with st.form(key="config_form"):
+        # Saved locations as Location rows, used as the form defaults
+        saved_locs = [Location._make(row) for row in st.session_state.locations_df.itertuples(index=False, name=None)]
         num_locations = st.number_input("Number of locations", min_value=2, max_value=20, 
-                                      value=max(3, len(st.session_state.locations)), step=1)
+                                      value=max(3, len(saved_locs)), step=1)
         
         # Collect location inputs
         locs_temp = []
@@ -112,16 +232,16 @@ with st.sidebar:
         for i in range(int(num_locations)):
             default_name = f"Point{i+1}"
             # If session has that index already, show its saved values as defaults
-            if i < len(st.session_state.locations):
-                existing = st.session_state.locations[i]
-                name = st.text_input(f"Name {i+1}", value=existing["name"], key=f"name_{i}")
-                lat = st.number_input(f"Latitude {i+1}", value=existing["lat"], key=f"lat_{i}")
-                lon = st.number_input(f"Longitude {i+1}", value=existing["lon"], key=f"lon_{i}")
+            if i < len(saved_locs):
+                existing = saved_locs[i]
+                name = st.text_input(f"Name {i+1}", value=existing.name, key=f"name_{i}")
+                lat = st.number_input(f"Latitude {i+1}", value=existing.lat, key=f"lat_{i}")
+                lon = st.number_input(f"Longitude {i+1}", value=existing.lon, key=f"lon_{i}")
             else:
                 name = st.text_input(f"Name {i+1}", value=default_name, key=f"name_{i}")
                 lat = st.number_input(f"Latitude {i+1}", value=19.0760 + i*0.005, key=f"lat_{i}")
                 lon = st.number_input(f"Longitude {i+1}", value=72.8777 + i*0.005, key=f"lon_{i}")
-            locs_temp.append({"name": name.strip(), "lat": float(lat), "lon": float(lon)})
+            locs_temp.append(Location(name.strip(), float(lat), float(lon)))
 
         st.markdown("---")
         st.markdown("**Roads / Edges**")
@@ -134,7 +254,13 @@ with st.sidebar:
         num_edges = st.number_input("Number of roads (edges) to define", min_value=1, max_value=100, 
                                   value=max(1, len(st.session_state.edges)), step=1)
         edges_temp = []
-        options_names = [l["name"] for l in locs_temp if l["name"] != ""]
+        options_names = [l.name for l in locs_temp if l.name != ""]
+        
+        # Pairwise distances between all locations, computed once for every road below
+        if auto_calc:
+            name_to_idx = {l.name: idx for idx, l in enumerate(locs_temp)}
+            D = haversine(np.radians([l.lat for l in locs_temp]),
+                        np.radians([l.lon for l in locs_temp]))
         
         if not options_names:
             st.warning("Provide at least one valid location name before creating roads.")
@@ -146,12 +272,9 @@ with st.sidebar:
                 v = st.selectbox(f"To (road {i+1})", options=options_names, key=f"edge_v_{i}")
             with col2:
                 if auto_calc and u != v:
-                    # Find coordinates and calculate distance
-                    u_coords = next((l for l in locs_temp if l["name"] == u), None)
-                    v_coords = next((l for l in locs_temp if l["name"] == v), None)
-                    if u_coords and v_coords:
-                        dist = haversine_distance(u_coords["lat"], u_coords["lon"], 
-                                                v_coords["lat"], v_coords["lon"])
+                    # Look up the precomputed distance
+                    if u in name_to_idx and v in name_to_idx:
+                        dist = D[name_to_idx[u], name_to_idx[v]]
                         if distance_unit == "miles":
                             dist = dist * 0.621371  # Convert km to miles
                         w = st.number_input(f"Distance for road {i+1}", value=float(f"{dist:.2f}"), 
@@ -167,26 +290,46 @@ with st.sidebar:
 
     # When configuration is saved, validate and store in session state
     if submit_config:
-        # Validate unique names and non-empty
-        names = [l["name"] for l in locs_temp]
-        if any(n == "" for n in names):
-            st.error("Location names cannot be empty. Fix the empty names and save again.")
-        elif len(set(names)) != len(names):
-            st.error("Location names must be unique. Use distinct names.")
-        else:
-            # Validate edges: no self-loops
-            bad_edges = [e for e in edges_temp if e[0] == e[1]]
-            if bad_edges:
-                st.error("Roads cannot connect a location to itself. Fix edges.")
+        # Validate names (non-empty, unique) and edges (no self-loops) in one pass each
+        seen = set()
+        empties = 0
+        dups = []
+        for loc in locs_temp:
+            name = loc.name
+            if name == "":
+                empties += 1
+            elif name in seen:
+                dups.append(name)
             else:
-                st.session_state.locations = locs_temp
-                # filter edges to only those with endpoints present (just in case)
-                filtered_edges = [e for e in edges_temp if e[0] in names and e[1] in names]
-                st.session_state.edges = filtered_edges
-                # Clear last route when configuration changes
-                if "last_route" in st.session_state:
-                    st.session_state.last_route = {}
-                st.success("Configuration saved. You can now find routes.")
+                seen.add(name)
+        self_loops = 0
+        filtered_edges = []
+        for u, v, w in edges_temp:
+            if u == v:
+                self_loops += 1
+            # keep only edges with endpoints present (just in case)
+            elif u in seen and v in seen:
+                filtered_edges.append((u, v, w))
+
+        errors = []
+        if empties:
+            errors.append("Location names cannot be empty. Fix the empty names and save again.")
+        if dups:
+            errors.append(f"Location names must be unique. Use distinct names (duplicated: {', '.join(sorted(set(dups)))}).")
+        if self_loops:
+            errors.append("Roads cannot connect a location to itself. Fix edges.")
+
+        if errors:
+            for msg in errors:
+                st.error(msg)
+        else:
+            st.session_state.locations_df = pd.DataFrame(locs_temp, columns=["name", "lat", "lon"])
+            st.session_state.edges = filtered_edges
+            st.session_state.adj = build_adjacency(locs_temp, filtered_edges)
+            # Clear last route when configuration changes
+            if "last_route" in st.session_state:
+                st.session_state.last_route = {}
+            st.success("Configuration saved. You can now find routes.")
 
     # Map settings
     st.markdown("---")
@@ -195,34 +338,30 @@ with st.sidebar:
                               ["OpenStreetMap", "CartoDB Positron", "CartoDB Dark_Matter", "Stamen Terrain"])
         show_weights = st.checkbox("Show road distances", value=True)
         zoom_level = st.slider("Default Zoom", 10, 18, 13)
+        animate = st.checkbox("Animate route", value=False)
 
     # Saved routes section
-    if st.session_state.saved_routes:
-        st.markdown("---")
-        st.subheader("💾 Saved Routes")
-        for i, route in enumerate(st.session_state.saved_routes):
-            with st.expander(f"Route {i+1}: {route['path'][0]} → {route['path'][-1]} ({route['distance']:.2f} units)"):
-                st.write(f"**Path:** {' → '.join(route['path'])}")
-                st.write(f"**Distance:** {route['distance']:.2f} units")
-                st.write(f"**Saved:** {route['timestamp']}")
-                if st.button(f"Delete Route {i+1}", key=f"delete_{i}"):
-                    st.session_state.saved_routes.pop(i)
-                    st.rerun()
+    saved_routes_panel()
 
 # ------------------ MAIN AREA ------------------
 st.subheader("Map & Route Controls")
 
 # If no locations saved, show instruction
-if len(st.session_state.locations) == 0:
+if st.session_state.locations_df.empty:
     st.info("Use the sidebar to add locations and roads, then click 'Save Configuration'.")
     st.stop()
 
+# Saved locations as columns (structure of arrays)
+names_saved = st.session_state.locations_df["name"].tolist()
+lat_arr = st.session_state.locations_df["lat"].to_numpy(dtype=np.float64)
+lon_arr = st.session_state.locations_df["lon"].to_numpy(dtype=np.float64)
+
 # Show quick overview
 col1, col2 = st.columns([1, 1])
 with col1:
-    st.markdown(f"**Locations ({len(st.session_state.locations)}):**")
-    for loc in st.session_state.locations:
-        st.write(f"- {loc['name']}  (lat: {loc['lat']:.5f}, lon: {loc['lon']:.5f})")
+    st.markdown(f"**Locations ({len(names_saved)}):**")
+    for name, lat, lon in zip(names_saved, lat_arr, lon_arr):
+        st.write(f"- {name}  (lat: {lat:.5f}, lon: {lon:.5f})")
 with col2:
     st.markdown(f"**Roads ({len(st.session_state.edges)}):**")
     for u, v, w in st.session_state.edges:
@@ -235,7 +374,6 @@ st.subheader("🎯 Route Planning")
 col1, col2, col3 = st.columns([1, 1, 1])
 with col1:
     # Choose start and end from saved locations
-    names_saved = [l["name"] for l in st.session_state.locations]
     start = st.selectbox("🏠 Warehouse (start)", options=names_saved, index=0)
 with col2:
     end = st.selectbox("📦 Destination (end)", options=names_saved, index=min(1, len(names_saved)-1))
@@ -254,8 +392,14 @@ if multi_stop:
 # Button to compute
 compute = st.button("🚀 Find Shortest Route", type="primary")
 
-# Build graph object using cached function
-G = build_graph_cached(st.session_state.locations, st.session_state.edges)
+# Build the routing index using cached function. Names and edges (in entry order) fully
+# determine the saved adjacency dict, so sessions with different configs never share an entry
+loc_key = tuple(zip(names_saved, lat_arr.tolist(), lon_arr.tolist()))
+edge_key = tuple(st.session_state.edges)
+route_index = build_csgraph_cached(tuple(names_saved), edge_key, st.session_state.adj)
+
+# The maps are centered on the mean of the coordinate columns
+avg_lat, avg_lon = float(lat_arr.mean()), float(lon_arr.mean())
 
 # If compute pressed, run and show result
 if compute:
@@ -264,11 +408,11 @@ if compute:
         # Clear any previous route
         st.session_state.last_route = {}
     else:
-        if not G.has_node(start) or not G.has_node(end):
+        if start not in st.session_state.adj or end not in st.session_state.adj:
             st.error("Start or end node missing in the graph. Re-save configuration.")
             st.session_state.last_route = {}
         else:
-            path, total_distance = calculate_route(start, end, stops, G)
+            path, total_distance = calculate_route(start, end, stops, route_index)
             if path and total_distance is not None:
                 # Store in session state for persistence
                 st.session_state.last_route = {
@@ -299,50 +443,10 @@ if st.session_state.last_route:
         efficiency = (len(path)-1)/total_distance if total_distance > 0 else 0
         st.metric("Route Efficiency", f"{efficiency:.2f} stops/unit")
 
-    # Map: center around average coords
-    avg_lat = sum(l["lat"] for l in st.session_state.locations) / len(st.session_state.locations)
-    avg_lon = sum(l["lon"] for l in st.session_state.locations) / len(st.session_state.locations)
-    m = folium.Map(location=[avg_lat, avg_lon], zoom_start=zoom_level, tiles=map_tile)
-
-    # Add all nodes
-    for loc in st.session_state.locations:
-        folium.Marker([loc["lat"], loc["lon"]], popup=loc["name"],
-                      icon=folium.Icon(color="blue", icon="info-sign")).add_to(m)
-
-    # Draw all edges (light)
-    for u, v, w in st.session_state.edges:
-        c1 = coords_by_name(u)
-        c2 = coords_by_name(v)
-        if c1 and c2:
-            folium.PolyLine(locations=[c1, c2], weight=2, color="#888", opacity=0.6).add_to(m)
-            # mid label
-            if show_weights:
-                mid = [(c1[0] + c2[0]) / 2, (c1[1] + c2[1]) / 2]
-                folium.map.Marker(mid, icon=folium.DivIcon(
-                    html=f"<div style='font-size:10px; background:white; padding:2px; border-radius:2px;'>{w:.1f}</div>"
-                )).add_to(m)
-
-    # Path coordinates
-    path_coords = [coords_by_name(node) for node in path if coords_by_name(node) is not None]
-
-    # Animated path (AntPath)
-    AntPath(path_coords, color="#00cc44", weight=6, delay=1000).add_to(m)
-    
-    # Start & End markers larger
-    folium.Marker(path_coords[0], popup="Start: " + start, 
-                icon=folium.Icon(color="red", icon="home")).add_to(m)
-    folium.Marker(path_coords[-1], popup="End: " + end, 
-                icon=folium.Icon(color="green", icon="flag")).add_to(m)
-    
-    # Add markers for intermediate stops if multi-stop
-    if stops:
-        for i, stop in enumerate(stops):
-            coords = coords_by_name(stop)
-            if coords:
-                folium.Marker(coords, popup=f"Stop {i+1}: {stop}", 
-                            icon=folium.Icon(color="orange", icon="star")).add_to(m)
-
-    st_folium(m, width=1000, height=600)
+    # Map: built (and cached) as HTML, centered around average coords
+    html = render_map_html(loc_key, edge_key, tuple(path), tuple(stops),
+                           (avg_lat, avg_lon), zoom_level, map_tile, show_weights, animate)
+    components.html(html, height=600)
 
     # Export and save options
     st.markdown("---")
@@ -360,7 +464,7 @@ if st.session_state.last_route:
             st.rerun()
     
     with col2:
-        csv_data = export_route_to_csv(path, total_distance)
+        csv_data = export_route_to_csv(tuple(path), total_distance)
         st.download_button(
             "📄 Export as CSV",
             data=csv_data,
@@ -372,35 +476,18 @@ if st.session_state.last_route:
         # Simple route instructions
         st.download_button(
             "📋 Route Instructions",
-            data="\n".join([f"{i+1}. Go to {point}" for i, point in enumerate(path)]),
+            data=route_instructions(tuple(path)),
             file_name=f"route_instructions_{start}_to_{end}.txt",
             mime="text/plain"
         )
 
 else:
     # show map preview with all nodes and edges but no highlighted route
-    if st.session_state.locations:
-        avg_lat = sum(l["lat"] for l in st.session_state.locations) / len(st.session_state.locations)
-        avg_lon = sum(l["lon"] for l in st.session_state.locations) / len(st.session_state.locations)
-        m = folium.Map(location=[avg_lat, avg_lon], zoom_start=zoom_level, tiles=map_tile)
-        
-        for loc in st.session_state.locations:
-            folium.Marker([loc["lat"], loc["lon"]], popup=loc["name"],
-                          icon=folium.Icon(color="blue", icon="info-sign")).add_to(m)
-        
-        for u, v, w in st.session_state.edges:
-            c1 = coords_by_name(u)
-            c2 = coords_by_name(v)
-            if c1 and c2:
-                folium.PolyLine(locations=[c1, c2], weight=2, color="#888", opacity=0.6).add_to(m)
-                if show_weights:
-                    mid = [(c1[0] + c2[0]) / 2, (c1[1] + c2[1]) / 2]
-                    folium.map.Marker(mid, icon=folium.DivIcon(
-                        html=f"<div style='font-size:10px; background:white; padding:2px; border-radius:2px;'>{w:.1f}</div>"
-                    )).add_to(m)
-        
-        st_folium(m, width=1000, height=500)
+    if names_saved:
+        html = render_map_html(loc_key, edge_key, (), (),
+                               (avg_lat, avg_lon), zoom_level, map_tile, show_weights, animate)
+        components.html(html, height=500)
 
 # Footer
 st.markdown("---")
-st.markdown("*Built with Streamlit, NetworkX, and Folium*")
+st.markdown("*Built with Streamlit, SciPy, and Folium*")